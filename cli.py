@@ -7,9 +7,11 @@ Usage: python cli.py [command] [options]
 import argparse
 import sys
 import json
+import threading
 from hasher import (
     compute_hash, compute_all_hashes, save_hash,
-    verify_text, compare_texts, list_snapshots, delete_snapshot, ALGORITHMS
+    verify_text, compare_texts, compare_files, list_snapshots, delete_snapshot,
+    prefetch_vault, ALGORITHMS
 )
 
 
@@ -79,24 +81,24 @@ def cmd_verify(args):
     print(f"\n  Label           : {result['label']}")
     print(f"  Algorithm       : {result['algorithm']}")
     print(f"  Original hash   : {DIM}{result['original_hash']}{RESET}")
-    print(f"  Current hash    : {DIM}{result['current_hash']}{RESET}")
-    print(f"  Original length : {result['original_length']} chars")
-    print(f"  Current length  : {result['current_length']} chars")
+    current = result["current_hash"] or "(not computed — length differs)"
+    print(f"  Current hash    : {DIM}{current}{RESET}")
+    print(f"  Original length : {result['original_length']} {result['length_unit']}")
+    print(f"  Current length  : {result['current_length']} {result['length_unit']}")
     print(f"  Snapshot date   : {result['saved_at']}\n")
 
 
 def cmd_compare(args):
     """Compare two texts directly."""
     if args.file1 and args.file2:
-        text1 = open(args.file1).read()
-        text2 = open(args.file2).read()
+        result = compare_files(args.file1, args.file2, args.algorithm)
     else:
         print(f"\n  {YELLOW}Enter Text 1 (end with Ctrl+D):{RESET}")
         text1 = sys.stdin.read()
         print(f"\n  {YELLOW}Enter Text 2 (end with Ctrl+D):{RESET}")
         text2 = sys.stdin.read()
+        result = compare_texts(text1, text2, args.algorithm)
 
-    result = compare_texts(text1, text2, args.algorithm)
     if result["identical"]:
         print(f"\n  {GREEN}{BOLD}✔ IDENTICAL — Both texts are the same.{RESET}")
     else:
@@ -105,8 +107,8 @@ def cmd_compare(args):
     print(f"\n  Algorithm : {result['algorithm']}")
     print(f"  Hash 1    : {result['hash_1']}")
     print(f"  Hash 2    : {result['hash_2']}")
-    print(f"  Length 1  : {result['length_1']} chars")
-    print(f"  Length 2  : {result['length_2']} chars\n")
+    print(f"  Length 1  : {result['length_1']} bytes")
+    print(f"  Length 2  : {result['length_2']} bytes\n")
 
 
 def cmd_list(args):
@@ -132,8 +134,8 @@ def cmd_delete(args):
         print(f"\n  {YELLOW}⚠ Snapshot '{args.label}' not found.{RESET}\n")
 
 
-def main():
-    print(BANNER)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all subcommands."""
     parser = argparse.ArgumentParser(
         prog="hashguardian",
         description="Text Integrity Checker using Cryptographic Hashing"
@@ -170,12 +172,22 @@ def main():
     p_delete = sub.add_parser("delete", help="Delete a snapshot")
     p_delete.add_argument("label", help="Label of snapshot to delete")
 
-    args = parser.parse_args()
-    dispatch = {
-        "hash": cmd_hash, "save": cmd_save, "verify": cmd_verify,
-        "compare": cmd_compare, "list": cmd_list, "delete": cmd_delete,
-    }
-    dispatch[args.command](args)
+    return parser
+
+
+_PARSER = _build_parser()
+DISPATCH = {
+    "hash": cmd_hash, "save": cmd_save, "verify": cmd_verify,
+    "compare": cmd_compare, "list": cmd_list, "delete": cmd_delete,
+}
+
+
+def main():
+    print(BANNER)
+    # Pull the vault into the page cache while argparse runs.
+    threading.Thread(target=prefetch_vault, daemon=True).start()
+    args = _PARSER.parse_args()
+    DISPATCH[args.command](args)
 
 
 if __name__ == "__main__":
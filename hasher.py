@@ -1,67 +1,189 @@
 """
 HashGuardian - Text Integrity Checker
 Detects whether text has been modified by comparing cryptographic hashes.
+
+Text is always hashed as UTF-8; str.encode() is called without an argument
+throughout so CPython takes its UTF-8 fast path.
 """
 
+import base64
 import hashlib
+import hmac
 import json
 import os
-import datetime
+import stat
+import tempfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+
+try:
+    import blake3
+except ImportError:  # optional: pip install HashGuardian[fast]
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:  # optional: faster vault (de)serialization
+    orjson = None
+
+
+_CTORS = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha512": hashlib.sha512,
+    "blake2b": hashlib.blake2b,
+}
+if blake3 is not None:
+    _CTORS["blake3"] = blake3.blake3
+
+ALGORITHMS = tuple(_CTORS)  # stable order for --all output and CLI choices
+_now = datetime.now
+CHUNK_SIZE = 1 << 16  # 64 KiB reads keep the hashing loop cache-resident
+# hashlib drops the GIL while hashing, but spinning up a thread pool costs
+# tens of microseconds, so only inputs at least this large go parallel.
+PARALLEL_MIN_SIZE = 1 << 16
+VAULT_FILE = "hash_vault.jsonl"
+
+# Compact the log once stale lines (overwritten entries and tombstones)
+# make up more than this fraction of it.
+COMPACT_RATIO = 0.25
+
+# Replayed vault, reused while the file's (path, mtime, size) is unchanged.
+# "lines" counts log records so compaction can tell how much is stale.
+_vault_cache = {"key": None, "data": None, "lines": 0}
+_vault_path = (VAULT_FILE, Path(VAULT_FILE))
+
+
+def _unsupported_algorithm() -> ValueError:
+    """Error raised for algorithm names we don't support."""
+    return ValueError(f"Unsupported algorithm. Choose from: {list(ALGORITHMS)}")
+
+
+def _get_ctor(algorithm: str):
+    """Return the hash constructor for an algorithm name."""
+    try:
+        return _CTORS[algorithm]
+    except KeyError:
+        raise _unsupported_algorithm() from None
+
+
+def _specialize(ctor):
+    """Build a text -> hexdigest function with the constructor baked in."""
+    def compute(text: str) -> str:
+        return ctor(text.encode()).hexdigest()
+    return compute
+
+
+# One ready-made text hasher per algorithm, built once at import.
+_SPECIALIZED = {algo: _specialize(ctor) for algo, ctor in _CTORS.items()}
 
 
-ALGORITHMS = ["md5", "sha1", "sha256", "sha512"]
-VAULT_FILE = "hash_vault.json"
+def _hash_many(jobs: list) -> list:
+    """Run (ctor, data) jobs, in threads when the inputs are large enough."""
+    workers = min(len(jobs), os.cpu_count() or 1)
+    if workers < 2 or max(len(data) for _, data in jobs) < PARALLEL_MIN_SIZE:
+        return [ctor(data) for ctor, data in jobs]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda job: job[0](job[1]), jobs))
 
 
 def compute_hash(text: str, algorithm: str = "sha256") -> str:
     """Compute hash of given text using specified algorithm."""
-    if algorithm not in ALGORITHMS:
-        raise ValueError(f"Unsupported algorithm. Choose from: {ALGORITHMS}")
-    h = hashlib.new(algorithm)
-    h.update(text.encode("utf-8"))
-    return h.hexdigest()
+    try:
+        fn = _SPECIALIZED[algorithm]
+    except KeyError:
+        raise _unsupported_algorithm() from None
+    return fn(text)
+
+
+def compute_hashes_batch(texts: list, algorithm: str = "sha256") -> list:
+    """Compute hashes of many texts with one algorithm, in input order."""
+    ctor = _get_ctor(algorithm)
+    return [ctor(text.encode()).hexdigest() for text in texts]
+
+
+def _hash_file(path, algorithm: str):
+    """Stream a file through the hasher. Returns (hash object, byte count)."""
+    h = _get_ctor(algorithm)()
+    size = 0
+    with open(path, "rb", buffering=0) as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+            size += len(chunk)
+    return h, size
+
+
+def compute_hash_file(path, algorithm: str = "sha256") -> str:
+    """Compute hash of a file's contents without loading it into memory."""
+    return _hash_file(path, algorithm)[0].hexdigest()
 
 
 def compute_all_hashes(text: str) -> dict:
     """Compute hashes using all supported algorithms."""
-    return {algo: compute_hash(text, algo) for algo in ALGORITHMS}
+    data = text.encode()
+    hashes = _hash_many([(_CTORS[algo], data) for algo in ALGORITHMS])
+    return {algo: h.hexdigest() for algo, h in zip(ALGORITHMS, hashes)}
 
 
-def save_hash(label: str, text: str, algorithm: str = "sha256") -> dict:
-    """Save a hash snapshot to the vault."""
-    vault = load_vault()
-    entry = {
+def save_hash(label: str, text: str, algorithm: str = "sha256",
+              timestamp: Optional[str] = None) -> dict:
+    """Save a hash snapshot to the vault. Length is recorded in UTF-8 bytes.
+
+    Batch callers can pass one precomputed ISO ``timestamp`` for every entry.
+    """
+    if timestamp is None:
+        timestamp = _now().isoformat()
+    data = text.encode()
+    digest = _get_ctor(algorithm)(data).digest()
+    record = {
         "label": label,
         "algorithm": algorithm,
-        "hash": compute_hash(text, algorithm),
-        "length": len(text),
-        "timestamp": datetime.datetime.now().isoformat(),
+        "hash_b64": base64.b64encode(digest).decode("ascii"),
+        "length": len(data),
+        "timestamp": timestamp,
     }
-    vault[label] = entry
-    save_vault(vault)
-    return entry
+    _append_record(record)
+    compact_vault()
+    return _public_entry(record)
+
 
+def verify_text(label: str, text: str, full_hash: bool = False) -> dict:
+    """Verify if text matches the saved hash snapshot.
 
-def verify_text(label: str, text: str) -> dict:
-    """Verify if text matches the saved hash snapshot."""
-    vault = load_vault()
+    If the length differs from the snapshot the text is reported as
+    modified without hashing it, and ``current_hash`` is None. Pass
+    ``full_hash=True`` to always compute the current hash. Lengths are in
+    UTF-8 bytes, or characters for snapshots migrated from a legacy vault
+    (see ``length_unit``).
+    """
+    vault = _refresh_cache()["data"]
     if label not in vault:
         return {"status": "NOT_FOUND", "message": f"No snapshot found for label '{label}'"}
 
     entry = vault[label]
-    current_hash = compute_hash(text, entry["algorithm"])
-    original_hash = entry["hash"]
-    is_intact = current_hash == original_hash
+    data = text.encode()
+    original = _stored_digest(entry)
+    length_unit = entry.get("length_unit", "bytes")
+    current_length = len(text) if length_unit == "chars" else len(data)
+    if current_length != entry["length"] and not full_hash:
+        current_hash, is_intact = None, False
+    else:
+        h = _get_ctor(entry["algorithm"])(data)
+        current_hash = h.hexdigest()
+        is_intact = hmac.compare_digest(h.digest(), original)
 
     return {
         "status": "INTACT" if is_intact else "MODIFIED",
         "label": label,
         "algorithm": entry["algorithm"],
-        "original_hash": original_hash,
+        "original_hash": original.hex(),
         "current_hash": current_hash,
         "original_length": entry["length"],
-        "current_length": len(text),
+        "current_length": current_length,
+        "length_unit": length_unit,
         "saved_at": entry["timestamp"],
         "is_intact": is_intact,
     }
@@ -69,43 +191,275 @@ def verify_text(label: str, text: str) -> dict:
 
 def compare_texts(text1: str, text2: str, algorithm: str = "sha256") -> dict:
     """Compare two texts directly without saving."""
-    hash1 = compute_hash(text1, algorithm)
-    hash2 = compute_hash(text2, algorithm)
+    ctor = _get_ctor(algorithm)
+    data1, data2 = text1.encode(), text2.encode()
+    h1, h2 = _hash_many([(ctor, data1), (ctor, data2)])
     return {
         "algorithm": algorithm,
-        "hash_1": hash1,
-        "hash_2": hash2,
-        "identical": hash1 == hash2,
-        "length_1": len(text1),
-        "length_2": len(text2),
+        "hash_1": h1.hexdigest(),
+        "hash_2": h2.hexdigest(),
+        "identical": hmac.compare_digest(h1.digest(), h2.digest()),
+        "length_1": len(data1),
+        "length_2": len(data2),
     }
 
 
+def compare_files(path1, path2, algorithm: str = "sha256") -> dict:
+    """Compare two files by streaming their contents through the hasher."""
+    h1, size1 = _hash_file(path1, algorithm)
+    h2, size2 = _hash_file(path2, algorithm)
+    return {
+        "algorithm": algorithm,
+        "hash_1": h1.hexdigest(),
+        "hash_2": h2.hexdigest(),
+        "identical": hmac.compare_digest(h1.digest(), h2.digest()),
+        "length_1": size1,
+        "length_2": size2,
+    }
+
+
+def _get_path() -> Path:
+    """Path of the vault file, rebuilt only when VAULT_FILE is reassigned."""
+    global _vault_path
+    if _vault_path[0] != VAULT_FILE:
+        _vault_path = (VAULT_FILE, Path(VAULT_FILE))
+    return _vault_path[1]
+
+
+def _vault_key(path: Path):
+    """Identify the current on-disk version of the vault, or None if missing."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def _apply_record(vault: dict, record: dict):
+    """Replay one log record onto the in-memory vault."""
+    if record.get("_deleted"):
+        vault.pop(record["label"], None)
+    else:
+        vault[record["label"]] = record
+
+
+def _stored_digest(entry: dict) -> bytes:
+    """Raw digest of a vault record (base64, or hex in older records)."""
+    if "hash_b64" in entry:
+        return base64.b64decode(entry["hash_b64"])
+    return bytes.fromhex(entry["hash"])
+
+
+def _public_entry(entry: dict) -> dict:
+    """Vault record as handed to callers, with the digest as hex."""
+    public = {k: v for k, v in entry.items() if k != "hash_b64"}
+    public["hash"] = _stored_digest(entry).hex()
+    return public
+
+
+def _stored_record(entry: dict) -> dict:
+    """Vault record as written to the log, with the digest as base64."""
+    if "hash" not in entry:
+        return entry
+    record = {k: v for k, v in entry.items() if k != "hash"}
+    record["hash_b64"] = base64.b64encode(bytes.fromhex(entry["hash"])).decode("ascii")
+    return record
+
+
+def _dump_record(record: dict) -> bytes:
+    """Serialize one record as a compact JSON line."""
+    if orjson:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+def _migrate_legacy(path: Path) -> bool:
+    """Import a legacy JSON-dict vault into the log. Returns True if imported.
+
+    Vaults written before the log format were a single pretty-printed JSON
+    dict next to the log (``hash_vault.json``). This runs before the first
+    read or append that finds no log. Legacy entries recorded ``length`` in
+    characters, so they are tagged with ``length_unit: "chars"``. The old
+    file is kept as ``*.migrated``.
+    """
+    if path.suffix != ".jsonl":
+        return False
+    legacy = path.with_suffix(".json")
+    if not legacy.exists():
+        return False
+    old_vault = json.loads(legacy.read_bytes())
+    save_vault({
+        label: dict(entry, label=label, length_unit="chars")
+        for label, entry in old_vault.items()
+    })
+    legacy.replace(legacy.with_name(legacy.name + ".migrated"))
+    return True
+
+
+def _refresh_cache() -> dict:
+    """Bring the vault cache up to date with the file on disk."""
+    path = _get_path()
+    key = _vault_key(path)
+    if key is None and _migrate_legacy(path):
+        key = _vault_key(path)
+    if key is None:
+        _vault_cache.update(key=None, data={}, lines=0)
+    elif _vault_cache["key"] != key:
+        loads = orjson.loads if orjson else json.loads
+        vault, lines = {}, 0
+        raw_lines = path.read_bytes().splitlines()
+        for i, line in enumerate(raw_lines):
+            if line.strip():
+                try:
+                    record = loads(line)
+                except ValueError:
+                    # A torn final record is what an interrupted append
+                    # leaves behind; ignore it here (the next append repairs
+                    # the file). Anything earlier is corruption.
+                    if any(rest.strip() for rest in raw_lines[i + 1:]):
+                        raise
+                    break
+                _apply_record(vault, record)
+                lines += 1
+        _vault_cache.update(key=key, data=vault, lines=lines)
+    return _vault_cache
+
+
+def _repair_tail(f, size: int) -> bytes:
+    """Fix up a log whose last record lacks its newline, before appending.
+
+    A complete record just needs the newline; a torn one is truncated away.
+    Returns the bytes to write ahead of the next record.
+    """
+    if not size:
+        return b""
+    f.seek(size - 1)
+    if f.read(1) == b"\n":
+        return b""
+    pos = size
+    while pos > 0:
+        start = max(0, pos - CHUNK_SIZE)
+        f.seek(start)
+        cut = f.read(pos - start).rfind(b"\n")
+        if cut != -1:
+            start += cut + 1
+            break
+        pos = start
+    else:
+        start = 0
+    f.seek(start)
+    try:
+        json.loads(f.read(size - start))
+        return b"\n"
+    except ValueError:
+        f.truncate(start)
+        return b""
+
+
+def _append_record(record: dict):
+    """Append one record to the vault log, keeping the cache in step."""
+    path = _get_path()
+    before = _vault_key(path)
+    if before is None and _migrate_legacy(path):
+        before = _vault_key(path)
+    in_sync = before is None or _vault_cache["key"] == before
+    line = _dump_record(record)
+    with open(path, "a+b") as f:
+        # "a+" writes always land at the end; reads and truncate are for the repair.
+        line = _repair_tail(f, before[2] if before else 0) + line
+        base = f.seek(0, os.SEEK_END)
+        f.write(line)
+
+    after = _vault_key(path)
+    expected_size = base + len(line)
+    if not in_sync or after[2] != expected_size:
+        return  # someone else touched the file; reload on next access
+    if before is None:
+        _vault_cache.update(data={}, lines=0)
+    _apply_record(_vault_cache["data"], record)
+    _vault_cache["lines"] += 1
+    _vault_cache["key"] = after
+
+
+def prefetch_vault():
+    """Ask the OS to pull the vault file into the page cache ahead of a load.
+
+    Uses posix_fadvise(WILLNEED) where available, which returns immediately
+    and copies nothing into Python. Elsewhere the file is read in chunks
+    that are discarded.
+    """
+    try:
+        fd = os.open(_get_path(), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            while os.read(fd, CHUNK_SIZE):
+                pass
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 def load_vault() -> dict:
-    """Load the hash vault from disk."""
-    if Path(VAULT_FILE).exists():
-        with open(VAULT_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    """Load the hash vault from disk, reusing the cached copy if unchanged.
+
+    Entries carry the digest as hex under ``"hash"``, as list_snapshots does.
+    """
+    return {label: _public_entry(entry) for label, entry in _refresh_cache()["data"].items()}
 
 
 def save_vault(vault: dict):
-    """Save the hash vault to disk."""
-    with open(VAULT_FILE, "w") as f:
-        json.dump(vault, f, indent=2)
+    """Rewrite the vault log with exactly one record per snapshot.
+
+    Accepts entries as returned by load_vault (hex ``"hash"``) or as stored
+    in the log (``"hash_b64"``). The new log is written next to the old one
+    and renamed into place, so a crash mid-write leaves the previous vault
+    intact.
+    """
+    vault = {label: _stored_record(entry) for label, entry in vault.items()}
+    path = _get_path()
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.chmod(tmp, mode)  # mkstemp creates 0600; keep the vault's own mode
+            f.write(b"".join(map(_dump_record, vault.values())))
+        os.replace(tmp, path)
+        tmp = None
+    finally:
+        if tmp is not None:
+            os.unlink(tmp)
+    _vault_cache.update(key=_vault_key(path), data=dict(vault), lines=len(vault))
+
+
+def compact_vault(force: bool = False) -> bool:
+    """Rewrite the vault log if enough of it is stale. Returns True if rewritten."""
+    cache = _refresh_cache()
+    lines, live = cache["lines"], len(cache["data"])
+    if not lines or (not force and lines - live <= lines * COMPACT_RATIO):
+        return False
+    save_vault(cache["data"])
+    return True
 
 
 def list_snapshots() -> list:
     """List all saved snapshots."""
-    vault = load_vault()
-    return list(vault.values())
+    return [_public_entry(entry) for entry in _refresh_cache()["data"].values()]
 
 
 def delete_snapshot(label: str) -> bool:
     """Delete a snapshot from the vault."""
-    vault = load_vault()
-    if label in vault:
-        del vault[label]
-        save_vault(vault)
-        return True
-    return False
+    if label not in _refresh_cache()["data"]:
+        return False
+    _append_record({"label": label, "_deleted": True})
+    compact_vault()
+    return True
@@ -13,7 +13,8 @@ setup(
     python_requires=">=3.7",
     install_requires=[],
     extras_require={
-        "dev": ["pytest>=7.0"]
+        "dev": ["pytest>=7.0"],
+        "fast": ["blake3", "orjson"],
     },
     entry_points={
         "console_scripts": [
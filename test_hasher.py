@@ -7,9 +7,9 @@ import pytest
 import os
 import json
 from hasher import (
-    compute_hash, compute_all_hashes, save_hash,
-    verify_text, compare_texts, list_snapshots,
-    delete_snapshot, ALGORITHMS, VAULT_FILE
+    compute_hash, compute_all_hashes, compute_hashes_batch, save_hash,
+    verify_text, compare_texts, compare_files, compute_hash_file, list_snapshots,
+    delete_snapshot, load_vault, compact_vault, ALGORITHMS, VAULT_FILE
 )
 
 TEST_VAULT = "test_vault.json"
@@ -19,7 +19,7 @@ TEST_VAULT = "test_vault.json"
 def use_test_vault(monkeypatch, tmp_path):
     """Redirect vault to a temp file for each test."""
     import hasher
-    vault_path = tmp_path / "vault.json"
+    vault_path = tmp_path / "vault.jsonl"
     monkeypatch.setattr(hasher, "VAULT_FILE", str(vault_path))
 
 
@@ -42,6 +42,10 @@ class TestComputeHash:
         h = compute_hash("hello", "sha512")
         assert len(h) == 128
 
+    def test_blake2b_returns_128_chars(self):
+        h = compute_hash("hello", "blake2b")
+        assert len(h) == 128
+
     def test_all_algorithms_work(self):
         for algo in ALGORITHMS:
             h = compute_hash("test", algo)
@@ -78,6 +82,29 @@ class TestComputeAllHashes:
         for v in result.values():
             assert isinstance(v, str)
 
+    def test_parallel_path_matches_serial(self, monkeypatch):
+        import hasher
+        text = "large input " * 1000
+        serial = compute_all_hashes(text)
+        monkeypatch.setattr(hasher, "PARALLEL_MIN_SIZE", 0)
+        monkeypatch.setattr(hasher.os, "cpu_count", lambda: 4)
+        assert compute_all_hashes(text) == serial
+
+
+# ── compute_hashes_batch ──────────────────────────────────────
+
+class TestComputeHashesBatch:
+    def test_matches_compute_hash(self):
+        texts = ["alpha", "beta", "", "héllo"]
+        assert compute_hashes_batch(texts, "sha1") == [compute_hash(t, "sha1") for t in texts]
+
+    def test_empty_batch(self):
+        assert compute_hashes_batch([]) == []
+
+    def test_invalid_algorithm_raises(self):
+        with pytest.raises(ValueError):
+            compute_hashes_batch(["hello"], "fakehash")
+
 
 # ── save_hash & verify_text ───────────────────────────────────
 
@@ -89,6 +116,11 @@ class TestSaveAndVerify:
         assert "hash" in entry
         assert "timestamp" in entry
 
+    def test_save_with_explicit_timestamp(self):
+        entry = save_hash("stamped", "text", timestamp="2024-01-01T00:00:00")
+        assert entry["timestamp"] == "2024-01-01T00:00:00"
+        assert verify_text("stamped", "text")["saved_at"] == "2024-01-01T00:00:00"
+
     def test_verify_intact(self):
         save_hash("snap1", "the quick brown fox")
         result = verify_text("snap1", "the quick brown fox")
@@ -111,6 +143,23 @@ class TestSaveAndVerify:
         assert result["original_length"] == 5
         assert result["current_length"] == 11
 
+    def test_length_is_utf8_bytes(self):
+        entry = save_hash("snap_utf8", "héllo")
+        assert entry["length"] == 6
+        assert verify_text("snap_utf8", "héllo")["current_length"] == 6
+
+    def test_length_mismatch_skips_hash(self):
+        save_hash("snap6", "hello")
+        result = verify_text("snap6", "hello world")
+        assert result["is_intact"] is False
+        assert result["current_hash"] is None
+
+    def test_full_hash_on_length_mismatch(self):
+        save_hash("snap7", "hello")
+        result = verify_text("snap7", "hello world", full_hash=True)
+        assert result["is_intact"] is False
+        assert result["current_hash"] == compute_hash("hello world")
+
     def test_save_with_md5(self):
         save_hash("snap_md5", "test", algorithm="md5")
         result = verify_text("snap_md5", "test")
@@ -151,6 +200,40 @@ class TestCompareTexts:
         assert result["algorithm"] == "md5"
         assert result["identical"] is True
 
+    def test_parallel_path(self, monkeypatch):
+        import hasher
+        monkeypatch.setattr(hasher, "PARALLEL_MIN_SIZE", 0)
+        monkeypatch.setattr(hasher.os, "cpu_count", lambda: 2)
+        result = compare_texts("text one", "text two")
+        assert result["identical"] is False
+        assert result["hash_1"] == compute_hash("text one")
+        assert result["hash_2"] == compute_hash("text two")
+
+
+# ── file hashing ──────────────────────────────────────────────
+
+class TestFileHashing:
+    def test_file_hash_matches_text_hash(self, tmp_path):
+        path = tmp_path / "doc.txt"
+        path.write_bytes("héllo wörld".encode("utf-8"))
+        assert compute_hash_file(path) == compute_hash("héllo wörld")
+
+    def test_file_larger_than_chunk(self, tmp_path):
+        import hasher
+        text = "x" * (hasher.CHUNK_SIZE * 3 + 7)
+        path = tmp_path / "big.txt"
+        path.write_text(text)
+        assert compute_hash_file(path, "md5") == compute_hash(text, "md5")
+
+    def test_compare_files(self, tmp_path):
+        (tmp_path / "a.txt").write_text("same")
+        (tmp_path / "b.txt").write_text("same")
+        (tmp_path / "c.txt").write_text("different")
+        assert compare_files(tmp_path / "a.txt", tmp_path / "b.txt")["identical"] is True
+        result = compare_files(tmp_path / "a.txt", tmp_path / "c.txt")
+        assert result["identical"] is False
+        assert result["length_2"] == 9
+
 
 # ── list & delete ─────────────────────────────────────────────
 
@@ -177,3 +260,205 @@ class TestListAndDelete:
         save_hash("over", "version 2")
         result = verify_text("over", "version 2")
         assert result["is_intact"] is True
+
+
+# ── vault cache ───────────────────────────────────────────────
+
+class TestVaultCache:
+    def test_external_change_is_picked_up(self):
+        import hasher
+        save_hash("a", "text a")
+        assert set(load_vault()) == {"a"}
+        with open(hasher.VAULT_FILE, "a") as f:
+            f.write(json.dumps({"label": "a", "_deleted": True}) + "\n")
+        assert load_vault() == {}
+
+    def test_prefetch_is_harmless(self, monkeypatch):
+        import hasher
+        hasher.prefetch_vault()  # no vault yet
+        save_hash("a", "text a")
+        hasher.prefetch_vault()
+        monkeypatch.delattr(hasher.os, "posix_fadvise", raising=False)
+        hasher.prefetch_vault()
+        assert set(load_vault()) == {"a"}
+
+    def test_load_vault_returns_hex_hash(self):
+        save_hash("a", "hello")
+        entry = load_vault()["a"]
+        assert entry["hash"] == compute_hash("hello")
+        assert "hash_b64" not in entry
+
+    def test_save_vault_round_trips_loaded_entries(self):
+        import hasher
+        save_hash("a", "hello")
+        hasher.save_vault(load_vault())
+        assert "hash_b64" in _log_lines()[0]
+        assert verify_text("a", "hello")["is_intact"] is True
+
+    def test_returned_vault_is_a_copy(self):
+        save_hash("a", "text a")
+        load_vault().pop("a")
+        assert "a" in load_vault()
+
+
+# ── append-only log ───────────────────────────────────────────
+
+def _log_lines():
+    import hasher
+    with open(hasher.VAULT_FILE) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestVaultLog:
+    def test_save_appends_one_line(self):
+        save_hash("a", "text a")
+        save_hash("b", "text b")
+        assert [r["label"] for r in _log_lines()] == ["a", "b"]
+
+    def test_delete_appends_tombstone(self):
+        for label in "abcdefgh":
+            save_hash(label, "text")
+        delete_snapshot("a")
+        assert _log_lines()[-1] == {"label": "a", "_deleted": True}
+        assert "a" not in load_vault()
+
+    def test_last_write_wins(self):
+        import hasher
+        save_hash("a", "version 1")
+        entry = dict(_log_lines()[0], length=99)
+        with open(hasher.VAULT_FILE, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        assert load_vault()["a"]["length"] == 99
+
+    def test_torn_last_line_is_ignored_on_read(self):
+        import hasher
+        save_hash("a", "text a")
+        save_hash("b", "text b")
+        with open(hasher.VAULT_FILE, "a") as f:
+            f.write('{"label":"c","algo')
+        assert [s["label"] for s in list_snapshots()] == ["a", "b"]
+        with open(hasher.VAULT_FILE) as f:
+            assert f.read().endswith('{"label":"c","algo')  # reads never truncate
+
+    def test_save_right_after_torn_write(self, monkeypatch):
+        import hasher
+        save_hash("a", "text a")
+        save_hash("b", "text b")
+        with open(hasher.VAULT_FILE, "a") as f:
+            f.write('{"label":"c","algo')
+        monkeypatch.setitem(hasher._vault_cache, "key", None)  # fresh process
+        save_hash("d", "text d")
+        assert [r["label"] for r in _log_lines()] == ["a", "b", "d"]
+        monkeypatch.setitem(hasher._vault_cache, "key", None)
+        assert [s["label"] for s in list_snapshots()] == ["a", "b", "d"]
+
+    def test_missing_final_newline_keeps_record(self):
+        import hasher
+        save_hash("a", "text a")
+        with open(hasher.VAULT_FILE, "rb+") as f:
+            f.truncate(f.seek(0, 2) - 1)
+        save_hash("b", "text b")
+        assert [r["label"] for r in _log_lines()] == ["a", "b"]
+
+    def test_corrupt_middle_line_raises(self):
+        import hasher
+        save_hash("a", "text a")
+        with open(hasher.VAULT_FILE, "a") as f:
+            f.write('{"label":"c","algo\n')
+            f.write(json.dumps({"label": "b", "_deleted": True}) + "\n")
+        with pytest.raises(ValueError):
+            load_vault()
+
+    def test_digest_stored_as_base64(self):
+        import base64
+        entry = save_hash("a", "hello")
+        record = _log_lines()[0]
+        assert "hash" not in record
+        assert base64.b64decode(record["hash_b64"]).hex() == entry["hash"] == compute_hash("hello")
+
+    def test_legacy_hex_record_still_verifies(self):
+        import hasher
+        record = {"label": "old", "algorithm": "sha256", "hash": compute_hash("hello"),
+                  "length": 5, "timestamp": "2024-01-01T00:00:00"}
+        with open(hasher.VAULT_FILE, "w") as f:
+            f.write(json.dumps(record) + "\n")
+        assert verify_text("old", "hello")["is_intact"] is True
+        assert list_snapshots()[0]["hash"] == compute_hash("hello")
+
+    def test_compaction_drops_stale_lines(self):
+        for label in "abcd":
+            save_hash(label, "text")
+        delete_snapshot("a")
+        delete_snapshot("b")
+        assert [r["label"] for r in _log_lines()] == ["c", "d"]
+
+    def test_compact_vault_force(self):
+        save_hash("a", "text")
+        assert compact_vault() is False
+        assert compact_vault(force=True) is True
+        assert set(load_vault()) == {"a"}
+
+    def test_compaction_leaves_no_temp_file(self, tmp_path):
+        save_hash("a", "text")
+        compact_vault(force=True)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["vault.jsonl"]
+
+    def test_compaction_keeps_file_mode(self):
+        import hasher
+        save_hash("a", "text a")
+        os.chmod(hasher.VAULT_FILE, 0o640)
+        compact_vault(force=True)
+        assert os.stat(hasher.VAULT_FILE).st_mode & 0o777 == 0o640
+
+    def test_new_vault_gets_umask_default_mode(self):
+        import hasher
+        umask = os.umask(0o022)
+        try:
+            hasher.save_vault({})
+        finally:
+            os.umask(umask)
+        assert os.stat(hasher.VAULT_FILE).st_mode & 0o777 == 0o644
+
+    def test_failed_rewrite_keeps_vault_and_cleans_up(self, tmp_path, monkeypatch):
+        import hasher
+        save_hash("a", "text a")
+
+        def boom(record):
+            raise RuntimeError("disk full")
+        dump_record = hasher._dump_record
+        monkeypatch.setattr(hasher, "_dump_record", boom)
+        with pytest.raises(RuntimeError):
+            compact_vault(force=True)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["vault.jsonl"]
+        monkeypatch.setattr(hasher, "_dump_record", dump_record)
+        assert set(load_vault()) == {"a"}
+
+
+# ── legacy vault migration ────────────────────────────────────
+
+class TestLegacyMigration:
+    def _write_legacy(self, tmp_path, text):
+        legacy = {"old": {"label": "old", "algorithm": "sha256", "hash": compute_hash(text),
+                          "length": len(text), "timestamp": "2024-01-01T00:00:00"}}
+        with open(tmp_path / "vault.json", "w") as f:
+            json.dump(legacy, f, indent=2)
+
+    def test_legacy_vault_is_imported(self, tmp_path):
+        self._write_legacy(tmp_path, "hello")
+        assert [s["label"] for s in list_snapshots()] == ["old"]
+        assert verify_text("old", "hello")["is_intact"] is True
+        assert (tmp_path / "vault.json.migrated").exists()
+        assert not (tmp_path / "vault.json").exists()
+
+    def test_save_before_any_load_imports_legacy(self, tmp_path):
+        self._write_legacy(tmp_path, "hello")
+        save_hash("new", "t")
+        assert [s["label"] for s in list_snapshots()] == ["old", "new"]
+        assert not (tmp_path / "vault.json").exists()
+
+    def test_legacy_char_length_not_short_circuited(self, tmp_path):
+        self._write_legacy(tmp_path, "héllo")
+        result = verify_text("old", "héllo")
+        assert result["is_intact"] is True
+        assert result["length_unit"] == "chars"
+        assert result["current_length"] == 5